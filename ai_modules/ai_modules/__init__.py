@@ -101,8 +101,8 @@ def get_hub_searcher():
     return HubSearcher
 
 def get_shard_manager():
-    from .shard_manager import search_index, get_full_entry, add_entry
-    return {"search_index": search_index, "get_full_entry": get_full_entry, "add_entry": add_entry}
+    from .shard_manager import search_index, get_full_entry, add_entry, add_entries
+    return {"search_index": search_index, "get_full_entry": get_full_entry, "add_entry": add_entry, "add_entries": add_entries}
 
 def get_web_searcher():
     from .web_searcher import get_web_searcher
@@ -18,14 +18,9 @@ def initialize_hub():
         with open(INDEX_FILE, 'w', encoding='utf-8') as f:
             json.dump({"index": [], "stats": {"total": 0, "categories": {}}}, f, indent=2)
 
-def _check_duplicate(title, index_data):
-    """Check if an entry with similar title already exists.
-    Returns the duplicate entry if found, None otherwise."""
-    title_lower = title.lower().strip()
-    for entry in index_data.get("index", []):
-        if entry.get("title", "").lower().strip() == title_lower:
-            return entry
-    return None
+def _title_key(title):
+    """Normalised title used for duplicate detection."""
+    return title.lower().strip()
 
 def add_entry(title, content, category="Kiến Thức", source="AI Miner", tags=None, allow_duplicate=False):
     """Add a new entry into a shard and update the index.
@@ -41,64 +36,94 @@ def add_entry(title, content, category="Kiến Thức", source="AI Miner", tags=
     Returns:
         entry_id if added, None if skipped due to duplicate
     """
+    return add_entries([{"title": title, "content": content, "category": category, "source": source, "tags": tags}],
+                       allow_duplicate=allow_duplicate)[0]
+
+def add_entries(entries, allow_duplicate=False):
+    """Add several entries at once; the index and each touched shard are read and written only once.
+    
+    Args:
+        entries: List of dicts with title, content and optional category, source, tags
+        allow_duplicate: If False, skip entries whose title already exists
+        
+    Returns:
+        List with an entry_id per input entry (None where skipped as duplicate)
+    """
     initialize_hub()
     
     # Load index
     with open(INDEX_FILE, 'r', encoding='utf-8') as f:
         index_data = json.load(f)
     
-    # Check for duplicates unless explicitly allowed
-    if not allow_duplicate:
-        duplicate = _check_duplicate(title, index_data)
-        if duplicate:
-            print(f"⚠️ Skipped duplicate: '{title}' (existing ID: {duplicate['id']})")
-            return None
-    
-    entry_id = str(uuid.uuid4())[:8] + datetime.now().strftime("%Y%m%d%H%M%S")
-    timestamp = datetime.now().isoformat()
-    tags = tags or []
-    
-    # 1. Determine Shard
-    total_entries = index_data['stats']['total']
-    shard_id = (total_entries // MAX_ENTRIES_PER_SHARD) + 1
-    shard_filename = f"shard_{shard_id}.json"
-    shard_path = os.path.join(BASE_HUB_DIR, shard_filename)
-    
-    # 2. Save Full Content to Shard
-    shard_data = {"entries": {}}
-    if os.path.exists(shard_path):
-        with open(shard_path, 'r', encoding='utf-8') as f:
-            shard_data = json.load(f)
-            
-    shard_data["entries"][entry_id] = {
-        "id": entry_id,
-        "title": title,
-        "content": content,
-        "category": category,
-        "source": source,
-        "tags": tags,
-        "created_at": timestamp
-    }
-    
-    # Atomic Write to Shard
-    temp_shard_path = f"{shard_path}.tmp"
-    with open(temp_shard_path, 'w', encoding='utf-8') as f:
-        json.dump(shard_data, f, indent=2, ensure_ascii=False)
-    os.replace(temp_shard_path, shard_path)
+    known_titles = {_title_key(e.get("title", "")): e for e in index_data.get("index", [])}
+    shards = {}
+    entry_ids = []
+    for e in entries:
+        title = e["title"]
+        category = e.get("category", "Kiến Thức")
+        
+        # Check for duplicates unless explicitly allowed
+        if not allow_duplicate:
+            duplicate = known_titles.get(_title_key(title))
+            if duplicate:
+                print(f"⚠️ Skipped duplicate: '{title}' (existing ID: {duplicate['id']})")
+                entry_ids.append(None)
+                continue
+        
+        entry_id = str(uuid.uuid4())[:8] + datetime.now().strftime("%Y%m%d%H%M%S")
+        timestamp = datetime.now().isoformat()
+        tags = e.get("tags") or []
+        
+        # 1. Determine Shard
+        total_entries = index_data['stats']['total']
+        shard_id = (total_entries // MAX_ENTRIES_PER_SHARD) + 1
+        shard_filename = f"shard_{shard_id}.json"
+        
+        if shard_filename not in shards:
+            shard_path = os.path.join(BASE_HUB_DIR, shard_filename)
+            shards[shard_filename] = {"entries": {}}
+            if os.path.exists(shard_path):
+                with open(shard_path, 'r', encoding='utf-8') as f:
+                    shards[shard_filename] = json.load(f)
         
-    # 3. Update Index (Lightweight Info)
-    index_data["index"].append({
-        "id": entry_id,
-        "shard": shard_filename,
-        "title": title,
-        "category": category,
-        "tags": tags,
-        "created_at": timestamp
-    })
+        # 2. Stage Full Content in Shard
+        shards[shard_filename]["entries"][entry_id] = {
+            "id": entry_id,
+            "title": title,
+            "content": e["content"],
+            "category": category,
+            "source": e.get("source", "AI Miner"),
+            "tags": tags,
+            "created_at": timestamp
+        }
+        
+        # 3. Update Index (Lightweight Info)
+        index_entry = {
+            "id": entry_id,
+            "shard": shard_filename,
+            "title": title,
+            "category": category,
+            "tags": tags,
+            "created_at": timestamp
+        }
+        index_data["index"].append(index_entry)
+        known_titles[_title_key(title)] = index_entry
+        
+        # Update Stats
+        index_data["stats"]["total"] += 1
+        index_data["stats"]["categories"][category] = index_data["stats"]["categories"].get(category, 0) + 1
+        entry_ids.append(entry_id)
+    
+    if not shards:
+        return entry_ids
     
-    # Update Stats
-    index_data["stats"]["total"] += 1
-    index_data["stats"]["categories"][category] = index_data["stats"]["categories"].get(category, 0) + 1
+    # Atomic Write to Shards
+    for shard_filename, shard_data in shards.items():
+        shard_path = os.path.join(BASE_HUB_DIR, shard_filename)
+        temp_shard_path = f"{shard_path}.tmp"
+        with open(temp_shard_path, 'w', encoding='utf-8') as f:
+            json.dump(shard_data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_shard_path, shard_path)
     
     # Atomic Write to Index
     temp_index_path = f"{INDEX_FILE}.tmp"
@@ -106,7 +131,7 @@ def add_entry(title, content, category="Kiến Thức", source="AI Miner", tags=
         json.dump(index_data, f, indent=2, ensure_ascii=False)
     os.replace(temp_index_path, INDEX_FILE)
         
-    return entry_id
+    return entry_ids
 
 def search_index(query="", category="Tất cả"):
     """Search the lightweight index for matches."""
@@ -270,7 +295,7 @@ def cleanup_duplicates():
         duplicates = []
         
         for entry in index_data.get("index", []):
-            title_key = entry.get("title", "").lower().strip()
+            title_key = _title_key(entry.get("title", ""))
             if title_key in seen_titles:
                 duplicates.append(entry["id"])
             else:
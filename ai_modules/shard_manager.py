@@ -20,58 +20,72 @@ def initialize_hub():
 
 def add_entry(title, content, category="Kiến Thức", source="AI Miner", tags=None):
     """Add a new entry into a shard and update the index."""
+    return add_entries([{"title": title, "content": content, "category": category, "source": source, "tags": tags}])[0]
+
+def add_entries(entries):
+    """Add several entries at once; the index and each touched shard are read and written only once."""
     initialize_hub()
     
-    entry_id = str(uuid.uuid4())[:8] + datetime.now().strftime("%Y%m%d%H%M%S")
-    timestamp = datetime.now().isoformat()
-    tags = tags or []
-    
-    # 1. Determine Shard
     with open(INDEX_FILE, 'r', encoding='utf-8') as f:
         index_data = json.load(f)
-        
-    total_entries = index_data['stats']['total']
-    shard_id = (total_entries // MAX_ENTRIES_PER_SHARD) + 1
-    shard_filename = f"shard_{shard_id}.json"
-    shard_path = os.path.join(BASE_HUB_DIR, shard_filename)
     
-    # 2. Save Full Content to Shard
-    shard_data = {"entries": {}}
-    if os.path.exists(shard_path):
-        with open(shard_path, 'r', encoding='utf-8') as f:
-            shard_data = json.load(f)
-            
-    shard_data["entries"][entry_id] = {
-        "id": entry_id,
-        "title": title,
-        "content": content,
-        "category": category,
-        "source": source,
-        "tags": tags,
-        "created_at": timestamp
-    }
-    
-    with open(shard_path, 'w', encoding='utf-8') as f:
-        json.dump(shard_data, f, indent=2, ensure_ascii=False)
+    shards = {}
+    entry_ids = []
+    for e in entries:
+        entry_id = str(uuid.uuid4())[:8] + datetime.now().strftime("%Y%m%d%H%M%S")
+        timestamp = datetime.now().isoformat()
+        category = e.get("category", "Kiến Thức")
+        tags = e.get("tags") or []
+        
+        # 1. Determine Shard
+        total_entries = index_data['stats']['total']
+        shard_id = (total_entries // MAX_ENTRIES_PER_SHARD) + 1
+        shard_filename = f"shard_{shard_id}.json"
+        
+        if shard_filename not in shards:
+            shard_path = os.path.join(BASE_HUB_DIR, shard_filename)
+            shards[shard_filename] = {"entries": {}}
+            if os.path.exists(shard_path):
+                with open(shard_path, 'r', encoding='utf-8') as f:
+                    shards[shard_filename] = json.load(f)
         
-    # 3. Update Index (Lightweight Info)
-    index_data["index"].append({
-        "id": entry_id,
-        "shard": shard_filename,
-        "title": title,
-        "category": category,
-        "tags": tags,
-        "created_at": timestamp
-    })
+        # 2. Stage Full Content in Shard
+        shards[shard_filename]["entries"][entry_id] = {
+            "id": entry_id,
+            "title": e["title"],
+            "content": e["content"],
+            "category": category,
+            "source": e.get("source", "AI Miner"),
+            "tags": tags,
+            "created_at": timestamp
+        }
+        
+        # 3. Update Index (Lightweight Info)
+        index_data["index"].append({
+            "id": entry_id,
+            "shard": shard_filename,
+            "title": e["title"],
+            "category": category,
+            "tags": tags,
+            "created_at": timestamp
+        })
+        
+        # Update Stats
+        index_data["stats"]["total"] += 1
+        index_data["stats"]["categories"][category] = index_data["stats"]["categories"].get(category, 0) + 1
+        entry_ids.append(entry_id)
+    
+    if not shards:
+        return entry_ids
     
-    # Update Stats
-    index_data["stats"]["total"] += 1
-    index_data["stats"]["categories"][category] = index_data["stats"]["categories"].get(category, 0) + 1
+    for shard_filename, shard_data in shards.items():
+        with open(os.path.join(BASE_HUB_DIR, shard_filename), 'w', encoding='utf-8') as f:
+            json.dump(shard_data, f, indent=2, ensure_ascii=False)
     
     with open(INDEX_FILE, 'w', encoding='utf-8') as f:
         json.dump(index_data, f, indent=2, ensure_ascii=False)
         
-    return entry_id
+    return entry_ids
 
 def search_index(query="", category="Tất cả"):
     """Search the lightweight index for matches."""
@@ -0,0 +1,76 @@
+"""Shard Hub bulk write test — add_entries in both shard_manager copies"""
+import os
+import sys
+import json
+import tempfile
+import importlib.util
+sys.stdout.reconfigure(encoding='utf-8')
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# label -> (path, skips duplicate titles)
+COPIES = {
+    "ai_modules/shard_manager.py": (os.path.join(ROOT, "ai_modules", "shard_manager.py"), False),
+    "ai_modules/ai_modules/shard_manager.py": (os.path.join(ROOT, "ai_modules", "ai_modules", "shard_manager.py"), True),
+}
+
+def load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def check(label, m, dedup):
+    m.MAX_ENTRIES_PER_SHARD = 2
+    print(f"--- {label} ---")
+
+    # Empty batch must not create/rewrite anything beyond the initial index
+    m.initialize_hub()
+    before = os.path.getmtime(m.INDEX_FILE)
+    os.utime(m.INDEX_FILE, (before - 100, before - 100))
+    assert m.add_entries([]) == []
+    assert os.path.getmtime(m.INDEX_FILE) == before - 100, "empty batch rewrote the index"
+    print("✅ Empty batch: no write")
+
+    # Batch spanning shards + a duplicate title inside the batch
+    batch = [{"title": f"T{i}", "content": f"c{i}", "category": "K"} for i in range(5)]
+    batch.append({"title": "t0 ", "content": "dup", "category": "K"})
+    ids = m.add_entries(batch)
+    expected = 5 if dedup else 6
+    assert len(ids) == 6
+    assert sum(1 for i in ids if i) == expected, ids
+    if dedup:
+        assert ids[-1] is None, "in-batch duplicate was not skipped"
+        print("✅ In-batch duplicate skipped")
+    else:
+        assert ids[-1] is not None, "duplicate title was unexpectedly skipped"
+        print("✅ Duplicate title kept (no dedup in this copy)")
+
+    stats = m.get_hub_stats()
+    assert stats["total"] == expected, stats
+    assert stats["categories"] == {"K": expected}, stats
+    shards = sorted(f for f in os.listdir(m.BASE_HUB_DIR) if f.startswith("shard_"))
+    assert shards == [f"shard_{n}.json" for n in range(1, (expected + 1) // 2 + 1)], shards
+    print(f"✅ {expected} entries across {len(shards)} shards, stats OK")
+
+    # Every index entry points at a shard that holds its content
+    with open(m.INDEX_FILE, 'r', encoding='utf-8') as f:
+        index = json.load(f)["index"]
+    for e in index:
+        full = m.get_full_entry(e["id"], e["shard"])
+        assert full and full["title"] == e["title"], e
+    print("✅ Index and shards consistent")
+
+    # add_entry still delegates correctly
+    eid = m.add_entry("Single", "x", "Khác")
+    assert eid and m.get_hub_stats()["total"] == expected + 1
+    print("✅ add_entry OK")
+
+start = os.getcwd()
+for n, (label, (path, dedup)) in enumerate(COPIES.items()):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            check(label, load(f"shard_bulk_{n}", path), dedup)
+        finally:
+            os.chdir(start)
+print("✅ All shard bulk checks passed")
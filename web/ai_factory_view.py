@@ -2,56 +2,233 @@ import streamlit as st
 import sys
 import os
 import json
+import atexit
+import functools
+import importlib.util
+import pickle
+import shutil
+import tempfile
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
-# --- SYSTEM PATH SETUP ---
+# --- SYSTEM PATH SETUP (once per process) ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
-root_dir = os.path.dirname(current_dir)
-if root_dir not in sys.path: sys.path.insert(0, root_dir)
-if current_dir not in sys.path: sys.path.insert(0, current_dir)
-
-# --- IMPORTS ---
-try:
-    try:
-        from web.ai_factory_tabs import render_universal_data_hub_tab, render_system_management_tab, render_mining_summary_on_dashboard
-        from ai_modules.shard_manager import add_entry, get_hub_stats
-        from ai_modules.factory_manager import init_global_factory
-    except ImportError:
-        from ai_factory_tabs import render_universal_data_hub_tab, render_system_management_tab, render_mining_summary_on_dashboard
-        from shard_manager import add_entry, get_hub_stats
-        from factory_manager import init_global_factory
-except Exception as e:
-    st.error(f"🚨 Lỗi nạp Hệ thống: {e}")
-    def render_universal_data_hub_tab(): st.error("Tab Dữ Liệu lỗi")
-    def render_system_management_tab(): st.error("Tab Quản Trị lỗi")
-    def add_entry(*args, **kwargs): return False
-
-# Import modules from ai_modules
-try:
-    from ai_modules.orchestrator import AIOrchestrator
-    from ai_modules.memory_system import MemorySystem
-except ImportError:
-    st.error("⚠️ Không thể tải ai_modules")
-
-# n8n Integration
-try:
-    from n8n_integration import N8nClient as N8NClient, setup_n8n_config
-except ImportError:
-    class N8NClient:
-        def __init__(self, base_url="http://localhost:5678", api_key=None):
-            self.base_url = base_url
-            self.api_key = api_key
-        def test_connection(self): return False
-        def get_workflow_statistics(self): return {'total_workflows': 0, 'active_workflows': 0}
-        def get_execution_statistics(self): return {'total_executions': 0, 'successful': 0, 'executions': []}
-        def get_workflows(self): return []
-    def setup_n8n_config(*args, **kwargs): pass
+
+@functools.lru_cache(maxsize=1)
+def setup_environment():
+    root_dir = os.path.dirname(current_dir)
+    known = set(sys.path)  # one O(n) pass instead of a list scan per entry
+    for p in (root_dir, current_dir):
+        if p not in known:
+            sys.path.insert(0, p)
+            known.add(p)
+    return root_dir
+
+root_dir = setup_environment()
+
+# --- IMPORTS (bound once per process by load_factory_tabs) ---
+def render_universal_data_hub_tab(): st.error("Tab Dữ Liệu lỗi")
+def render_system_management_tab(): st.error("Tab Quản Trị lỗi")
+def render_mining_summary_on_dashboard(key_suffix=""): pass
+def add_entries(entries): return []
+def get_hub_stats(): return {"total": 0, "categories": {}, "size_mb": 0.0}
+def init_global_factory(): return None
+
+_SPECS: dict = {}
+
+class _ModuleMissing(ImportError):
+    """None of the candidate names exist (find_spec found nothing), so retrying cannot help."""
+
+def _import_first(*targets):
+    """Import the first of `targets` that exists; find_spec probes for existence instead of catching ImportError."""
+    for target in targets:
+        if target not in _SPECS:
+            try: _SPECS[target] = importlib.util.find_spec(target)
+            except (ImportError, ValueError): _SPECS[target] = None
+        if _SPECS[target] is None: continue
+        # import_module takes the per-module import lock, so a concurrent session
+        # waits for the first load instead of seeing a half-initialised module
+        return importlib.import_module(target)
+    raise _ModuleMissing(f"No module named {targets[0]!r}")
+
+_TABS_LOADED: bool | None = None
+_TABS_ERROR = None
+_TABS_LOCK = threading.Lock()
+
+def load_factory_tabs():
+    """Bind the factory tab renderers; only a truly missing module is remembered as a failure."""
+    global _TABS_LOADED, _TABS_ERROR
+    global render_universal_data_hub_tab, render_system_management_tab, render_mining_summary_on_dashboard
+    global add_entries, get_hub_stats, init_global_factory
+    if _TABS_LOADED is not None: return _TABS_LOADED
+    with _TABS_LOCK:
+        if _TABS_LOADED is not None: return _TABS_LOADED
+        try:
+            tabs = _import_first("web.ai_factory_tabs", "ai_factory_tabs")
+            shard = _import_first("ai_modules.shard_manager", "shard_manager")
+            factory = _import_first("ai_modules.factory_manager", "factory_manager")
+            render_universal_data_hub_tab = tabs.render_universal_data_hub_tab
+            render_system_management_tab = tabs.render_system_management_tab
+            render_mining_summary_on_dashboard = tabs.render_mining_summary_on_dashboard
+            add_entries, get_hub_stats = shard.add_entries, shard.get_hub_stats
+            init_global_factory = factory.init_global_factory
+            _TABS_LOADED, _TABS_ERROR = True, None
+        except _ModuleMissing as e:
+            _TABS_ERROR = e
+            _TABS_LOADED = False
+        except Exception as e:
+            # Transient/partial failure: report it but retry on the next rerun
+            _TABS_ERROR = e
+            return False
+    return _TABS_LOADED
+
+# --- LAZY IMPORTS (heavy modules load on first use, not on every rerun) ---
+# A failed import shows an error and re-raises; nothing is cached, so the next rerun retries
+_Orch = None
+_Memory = None
+_N8N = None
+
+def _get_orchestrator_cls():
+    global _Orch
+    if _Orch is None:
+        try:
+            from ai_modules.orchestrator import AIOrchestrator as _Orch
+        except ImportError:
+            st.error("⚠️ Không thể tải ai_modules")
+            raise
+    return _Orch
+
+def _get_memory_cls():
+    global _Memory
+    if _Memory is None:
+        try:
+            from ai_modules.memory_system import MemorySystem as _Memory
+        except ImportError:
+            st.error("⚠️ Không thể tải ai_modules")
+            raise
+    return _Memory
+
+def _get_n8n_cls():
+    global _N8N
+    if _N8N is None:
+        try:
+            from n8n_integration import N8nClient as _N8N
+        except ImportError:
+            class _N8N:
+                def __init__(self, base_url="http://localhost:5678", api_key=None):
+                    self.base_url = base_url
+                    self.api_key = api_key
+                def test_connection(self): return False
+                def get_workflow_statistics(self): return {'total_workflows': 0, 'active_workflows': 0}
+                def get_execution_statistics(self): return {'total_executions': 0, 'successful': 0, 'executions': []}
+                def get_workflows(self): return []
+    return _N8N
+
+# --- CACHED FILE READS (mtime + size in key so edits invalidate) ---
+@st.cache_data(show_spinner=False, max_entries=256)
+def _read_text(path: str, mtime: float, size: int) -> str:
+    return Path(path).read_text(encoding='utf-8')
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _read_bytes(path: str, mtime: float, size: int) -> bytes:
+    return Path(path).read_bytes()
+
+def _load_text(path: str) -> str:
+    # Single stat for the cache key; raises OSError if the file is gone (EAFP)
+    info = os.stat(path)
+    return _read_text(path, info.st_mtime, info.st_size)
+
+def _load_bytes(path: str) -> bytes:
+    info = os.stat(path)
+    return _read_bytes(path, info.st_mtime, info.st_size)
+
+# --- DASHBOARD CARD TEMPLATES ---
+_CARD_TMPL = 'flex:1 1 0;padding:15px;border-radius:10px;border-left:5px solid {color};background:#f8f9fa'
+_CARD_HTML = '<div style="{style}"><h3>{icon} {val}</h3><p>{label}</p></div>'
+_CARDS_ROW = '<div style="display:flex;gap:10px">{cards}</div>'
+
+# --- LAST RESULT (pickled into a private per-process dir; session_state keeps only the path) ---
+# mkdtemp makes a fresh 0700 directory, so no other local user can plant a pickle in it
+_RES_DIR = tempfile.mkdtemp(prefix="ai_factory_results_")
+atexit.register(shutil.rmtree, _RES_DIR, ignore_errors=True)
+_RES_ORPHAN_AGE = 24 * 3600  # seconds; far longer than a session, only reaps results of ended sessions
+
+def _purge_orphan_res():
+    cutoff = time.time() - _RES_ORPHAN_AGE
+    for name in os.listdir(_RES_DIR):
+        fp = os.path.join(_RES_DIR, name)
+        try:
+            if os.path.getmtime(fp) < cutoff: os.remove(fp)
+        except OSError: pass
+
+def _stash_res(res) -> str:
+    _purge_orphan_res()
+    old = st.session_state.get('last_res_path')
+    with tempfile.NamedTemporaryFile(dir=_RES_DIR, prefix="res_", suffix=".pkl", delete=False) as f:
+        pickle.dump(res, f)
+    if old:
+        try: os.remove(old)
+        except OSError: pass
+    return f.name
+
+# Each stash writes a new, never-modified file, so the path alone is a valid key
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
+def _load_res(path: str):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+# --- SHARED RESOURCES (one per process, shared across sessions) ---
+@st.cache_resource
+def get_n8n_client(base_url: str, api_key: str | None):
+    return _get_n8n_cls()(base_url, api_key)
+
+@st.cache_resource
+def _n8n_config() -> tuple[str, str | None]:
+    return (st.secrets.get("N8N_BASE_URL", "http://localhost:5678"), st.secrets.get("N8N_API_KEY", None))
+
+@st.cache_resource
+def get_memory():
+    # One sqlite3 connection shared by every session thread with no lock
+    # (check_same_thread=False only disables Python's check): keep it to reads
+    # such as get_statistics/search_knowledge; writes go through the orchestrator's own handle
+    return _get_memory_cls()()
+
+# --- MEMORY QUERIES (short TTL; cleared process-wide whenever the AI writes) ---
+@st.cache_data(ttl=5, show_spinner=False)
+def _cached_stats(_mem) -> dict:
+    return _mem.get_statistics()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_search(_mem, q: str) -> list:
+    return _mem.search_knowledge(q)
+
+# --- N8N HEALTH CHECK (up: 15s, down: 5s) ---
+@st.cache_data(ttl=15, show_spinner=False)
+def _n8n_alive(_c, base_url: str) -> bool:
+    # Raising keeps failures out of this 15s cache
+    if not _c.test_connection(): raise ConnectionError(base_url)
+    return True
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _n8n_connected(_c, base_url: str) -> bool:
+    try: return _n8n_alive(_c, base_url)
+    except ConnectionError: return False
+
+# st.fragment scopes widget reruns to one tab (Streamlit 1.33+; plain call on older versions)
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda f: f)
+
+def _invalidate_memory_cache():
+    # The caches and the memory handle are shared by all sessions, so invalidate for everyone
+    _cached_stats.clear()
+    _cached_search.clear()
 
 def render_ai_factory_view():
     st.markdown("## 🏭 NHÀ MÁY AI - PHÁT TRIỂN TỰ ĐỘNG")
     st.info("Hệ thống tích hợp n8n & Sharded Data Hub: Tự động hóa 24/7.")
-    
+    if not load_factory_tabs(): st.error(f"🚨 Lỗi nạp Hệ thống: {_TABS_ERROR}")
+
     # Initialize Global Factory Manager (Persistent 24/7)
     from ai_modules.autonomous_miner import load_config
     config = load_config()
@@ -70,49 +247,49 @@ def render_ai_factory_view():
             st.error(f"Lỗi khởi động 24/7: {e}")
 
     if 'orchestrator' not in st.session_state:
-        if 'gemini_key' in st.session_state and st.session_state.gemini_key:
-            st.session_state.orchestrator = AIOrchestrator(st.session_state.gemini_key)
+        # An ImportError propagates before anything is stored, so the next rerun retries
+        if st.session_state.get('gemini_key'):
+            st.session_state.orchestrator = _get_orchestrator_cls()(st.session_state.gemini_key)
         else:
             st.session_state.orchestrator = None
             
-    if 'memory' not in st.session_state:
-        st.session_state.memory = MemorySystem()
-        
-    if 'n8n_client' not in st.session_state:
-        n8n_url = st.secrets.get("N8N_BASE_URL", "http://localhost:5678")
-        n8n_key = st.secrets.get("N8N_API_KEY", None)
-        st.session_state.n8n_client = N8NClient(n8n_url, n8n_key)
-
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "🏠 Dashboard", "✍️ Tạo Code & Dự Án", "📚 Knowledge Base", 
-        "🌐 Kho Dữ Liệu Vô Tận", "⚙️ Workflows", "🛠️ Quản Trị Hệ Thống"
-    ])
-
-    with tab1: render_dashboard_tab()
-    with tab2: render_create_code_tab()
-    with tab3: render_knowledge_base_tab()
-    with tab4: render_universal_data_hub_tab()
-    with tab5: render_workflows_tab()
-    with tab6: render_system_management_tab()
+    st.session_state.memory = get_memory()
+
+    n8n_url, n8n_key = _n8n_config()
+    st.session_state.n8n_client = get_n8n_client(n8n_url, n8n_key)
+
+    # Only the selected view runs; st.tabs would execute all six bodies every rerun
+    views = {
+        "🏠 Dashboard": render_dashboard_tab,
+        "✍️ Tạo Code & Dự Án": render_create_code_tab,
+        "📚 Knowledge Base": render_knowledge_base_tab,
+        "🌐 Kho Dữ Liệu Vô Tận": render_universal_data_hub_tab,
+        "⚙️ Workflows": render_workflows_tab,
+        "🛠️ Quản Trị Hệ Thống": render_system_management_tab,
+    }
+    active = st.radio("Chế độ xem:", list(views), key="ai_factory_tab", horizontal=True, label_visibility="collapsed")
+    views[active]()
 
+@_fragment
 def render_dashboard_tab():
     st.subheader("Thống Kê Hoạt Động (Real-time)")
-    stats = st.session_state.memory.get_statistics()
+    stats = _cached_stats(st.session_state.memory)
     
     # Merge with Shard Hub Stats
     hub_stats = get_hub_stats()
     
-    col1, col2, col3, col4 = st.columns(4)
-    s = 'padding:15px;border-radius:10px;border-left:5px solid '
-    
-    # Show real Shard Hub total
-    col1.markdown(f'<div style="{s}#3b82f6;background:#f8f9fa"><h3>📁 {hub_stats.get("total", 0)}</h3><p>Shards Hub</p></div>', unsafe_allow_html=True)
-    col2.markdown(f'<div style="{s}#764ba2;background:#f8f9fa"><h3>📚 {stats.get("total_knowledge", 0)}</h3><p>Memory DB</p></div>', unsafe_allow_html=True)
-    col3.markdown(f'<div style="{s}#2ecc71;background:#f8f9fa"><h3>💾 {hub_stats.get("size_mb", 0.0)} MB</h3><p>Dung lượng</p></div>', unsafe_allow_html=True)
-    
     success = stats.get("executions_by_status", {}).get("success", 0)
     total = max(1, stats.get("total_executions", 0))
-    col4.markdown(f'<div style="{s}#e74c3c;background:#f8f9fa"><h3>✅ {int(success/total*100)}%</h3><p>Hệ thống</p></div>', unsafe_allow_html=True)
+    cards = (
+        ("#3b82f6", "📁", hub_stats.get("total", 0), "Shards Hub"),  # Show real Shard Hub total
+        ("#764ba2", "📚", stats.get("total_knowledge", 0), "Memory DB"),
+        ("#2ecc71", "💾", f'{hub_stats.get("size_mb", 0.0)} MB', "Dung lượng"),
+        ("#e74c3c", "✅", f'{int(success/total*100)}%', "Hệ thống"),
+    )
+    # One markdown element for all four cards instead of one per column
+    st.markdown(_CARDS_ROW.format(cards="".join(
+        _CARD_HTML.format(style=_CARD_TMPL.format(color=c), icon=i, val=v, label=l) for c, i, v, l in cards
+    )), unsafe_allow_html=True)
     
     st.markdown("---")
     render_mining_summary_on_dashboard(key_suffix="_dash")
@@ -121,7 +298,7 @@ def render_create_code_tab():
     if st.session_state.orchestrator is None:
         st.warning("⚠️ Nhập Gemini API key để bắt đầu.")
         return
-    if 'last_res' not in st.session_state: st.session_state.last_res = None
+    if 'last_res_path' not in st.session_state: st.session_state.last_res_path = None
 
     with st.form("gen_form"):
         req = st.text_area("Mô tả phần mềm:", height=100)
@@ -129,35 +306,46 @@ def render_create_code_tab():
             with st.spinner("🤖 Đang phân tích và viết code..."):
                 try:
                     res = st.session_state.orchestrator.process_request(req)
+                    _invalidate_memory_cache()
                     nm = res.get('plan',{}).get('project_name','Project')
                     
-                    # Store in SCALABLE HUB
-                    add_entry(f"Yêu cầu: {nm}", f"Mô tả: {req}\n\nPlan: {json.dumps(res.get('plan',{}), indent=2)}", "Nghiên Cứu", source="AI Architect")
+                    # Store in SCALABLE HUB (one bulk write for plan + sources)
+                    entries = [{"title": f"Yêu cầu: {nm}", "content": f"Mô tả: {req}\n\nPlan: {json.dumps(res.get('plan',{}), indent=2)}", "category": "Nghiên Cứu", "source": "AI Architect"}]
                     for f_p in res.get('execution',{}).get('created_files',[]):
-                        if os.path.exists(f_p):
-                            with open(f_p,'r',encoding='utf-8') as content:
-                                add_entry(f"Source: {os.path.basename(f_p)}", f"```python\n{content.read()}\n```", "Mã Nguồn", source="AI Coder")
+                        try: code = _load_text(f_p)
+                        except OSError: continue
+                        entries.append({"title": f"Source: {os.path.basename(f_p)}", "content": f"```python\n{code}\n```", "category": "Mã Nguồn", "source": "AI Coder"})
+                    add_entries(entries)
                     
-                    st.session_state.last_res = res
+                    st.session_state.last_res_path = _stash_res(res)
                     st.rerun()
                 except Exception as e: st.error(f"Lỗi: {e}")
 
-    if st.session_state.last_res:
-        res = st.session_state.last_res
+    res = None
+    if st.session_state.last_res_path:
+        try: res = _load_res(st.session_state.last_res_path)
+        except OSError: st.session_state.last_res_path = None
+    if res:
         st.success("✅ Dự án hoàn tất! Đã lưu trữ Shard và đồng bộ GitHub.")
-        if res.get('package') and os.path.exists(res['package']):
-            st.download_button("📥 Tải (.zip)", open(res['package'],"rb"), file_name=os.path.basename(res['package']))
-        for f_p in res.get('execution',{}).get('created_files',[]):
-            if os.path.exists(f_p):
-                with st.expander(os.path.basename(f_p)): st.code(open(f_p, 'r', encoding='utf-8').read())
+        try: pkg = _load_bytes(res['package']) if res.get('package') else None
+        except OSError: pkg = None
+        if pkg is not None: st.download_button("📥 Tải (.zip)", pkg, file_name=os.path.basename(res['package']))
+        # Highlight only the chosen file instead of one expander + st.code per file
+        files = res.get('execution',{}).get('created_files',[])
+        if files:
+            f_p = st.selectbox("📄 Xem file:", files, format_func=os.path.basename, key="ai_factory_file")
+            try: st.code(_load_text(f_p))
+            except OSError: st.warning(f"⚠️ Không tìm thấy file `{os.path.basename(f_p)}`")
 
+@_fragment
 def render_knowledge_base_tab():
     q = st.text_input("🔍 Truy vấn tri thức nhanh:")
     if q:
-        for i in st.session_state.memory.search_knowledge(q):
+        for i in _cached_search(st.session_state.memory, q):
             with st.expander(i['topic']): st.markdown(i['content'])
 
+@_fragment
 def render_workflows_tab():
     c = st.session_state.n8n_client
-    if c.test_connection(): st.success(f"✅ Đã kết nối n8n tại `{c.base_url}`")
+    if _n8n_connected(c, c.base_url): st.success(f"✅ Đã kết nối n8n tại `{c.base_url}`")
     else: st.warning("⚠️ Chưa kết nối n8n server")